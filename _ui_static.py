@@ -0,0 +1,535 @@
+"""
+Static web UI assets for the MCP HTTP servers.
+
+Kept out of the server scripts so the markup is loaded from this module's
+cached bytecode instead of being recompiled with the script on every start.
+"""
+
+# Terminal-style UI served by advanced_server.py
+ADVANCED_UI_HTML = """
+<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>MCP Shell</title><style>
+body{font-family:monospace;background-color:#1e1e1e;color:#d4d4d4;display:flex;flex-direction:column;height:100vh;margin:0}
+#header{padding:1rem;background-color:#252526;border-bottom:1px solid #333;display:flex;justify-content:space-between;align-items:center}
+#main{display:flex;flex:1;overflow:hidden}
+#sidebar{width:300px;background-color:#252526;padding:1rem;overflow-y:auto;border-right:1px solid #333}
+#content{flex:1;padding:1rem;display:flex;flex-direction:column}
+#output{flex:1;background-color:#1e1e1e;padding:1rem;overflow-y:auto;white-space:pre-wrap;margin-bottom:1rem;border-radius:4px;border:1px solid #333}
+#input-form{display:flex;gap:0.5rem}#command-input{flex:1;background-color:#3c3c3c;color:#d4d4d4;border:1px solid #3c3c3c;padding:0.5rem;border-radius:4px}
+#history-list{list-style:none;padding:0}#history-list li{padding:0.5rem;cursor:pointer;border-radius:4px;margin-bottom:5px;word-break:break-all}#history-list li:hover{background-color:#3c3c3c}
+.prompt{color:#608b4e}.error{color:#f44747}.command-echo{color:#569cd6;font-weight:bold}
+.exit-code-success{color:#4ec9b0}.exit-code-fail{color:#f44747}
+</style></head><body><div id="header"><h1>MCP Shell Server</h1><div id="session-info"></div></div>
+<div id="main"><div id="sidebar"><h2>History</h2><ul id="history-list"></ul></div>
+<div id="content"><div id="output"></div><form id="input-form" onsubmit="sendCommand(event)">
+<span class="prompt">$&nbsp;</span><input id="command-input" type="text" autocomplete="off" autofocus/>
+</form></div></div><script>
+let sessionId;
+const outputEl=document.getElementById('output');const historyEl=document.getElementById('history-list');const inputEl=document.getElementById('command-input');
+async function initSession(){const r=await fetch('/api/session',{method:'POST'});const d=await r.json();sessionId=d.session_id;document.getElementById('session-info').innerText=`Session: ${sessionId.substring(0,8)}`}
+async function sendCommand(e){e.preventDefault();const c=inputEl.value.trim();if(!c)return;
+appendOutput('$ '+c, 'command-echo');inputEl.value='';
+const f=new URLSearchParams();f.append('command',c);f.append('session_id',sessionId);
+try{const r=await fetch('/api/execute',{method:'POST',body:f});const d=await r.json();
+if(d.output)appendOutput(d.output);if(d.error)appendOutput(d.error,'error');
+appendOutput(`Exit Code: ${d.exit_code}`, d.exit_code===0 ? 'exit-code-success' : 'exit-code-fail');
+updateHistory();}catch(e){appendOutput('Network Error: '+e,'error')}finally{outputEl.scrollTop=outputEl.scrollHeight;}}
+function appendOutput(text,className=''){const d=document.createElement('div');if(className)d.className=className;d.textContent=text;outputEl.appendChild(d);}
+async function updateHistory(){const r=await fetch(`/api/history?session_id=${sessionId}`);const h=await r.json();
+historyEl.innerHTML='';h.reverse().forEach(item=>{const l=document.createElement('li');l.textContent=item.command;l.onclick=()=>{inputEl.value=item.command;inputEl.focus()};historyEl.appendChild(l)});};
+window.onload=initSession;
+</script></body></html>"""
+
+# Dashboard UI served by simple_http_server.py
+SIMPLE_UI_HTML = '''
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>MCP Noble Shell Server</title>
+    <style>
+        :root {
+            --bg-primary: #0a0e27;
+            --bg-secondary: #1a1f3a;
+            --text-primary: #e4e4e7;
+            --text-secondary: #a1a1aa;
+            --accent: #3b82f6;
+            --success: #10b981;
+            --error: #ef4444;
+            --warning: #f59e0b;
+        }
+        
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+        
+        body {
+            font-family: 'Segoe UI', system-ui, sans-serif;
+            background: var(--bg-primary);
+            color: var(--text-primary);
+            min-height: 100vh;
+            display: flex;
+            flex-direction: column;
+        }
+        
+        header {
+            background: var(--bg-secondary);
+            padding: 1rem 2rem;
+            border-bottom: 1px solid rgba(255,255,255,0.1);
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        
+        h1 {
+            font-size: 1.5rem;
+            font-weight: 600;
+            color: var(--accent);
+        }
+        
+        .stats {
+            display: flex;
+            gap: 2rem;
+            font-size: 0.875rem;
+        }
+        
+        .stat {
+            color: var(--text-secondary);
+        }
+        
+        .stat span {
+            color: var(--text-primary);
+            font-weight: 500;
+        }
+        
+        main {
+            flex: 1;
+            display: flex;
+            padding: 2rem;
+            gap: 2rem;
+            max-width: 1400px;
+            width: 100%;
+            margin: 0 auto;
+        }
+        
+        .terminal-section {
+            flex: 1;
+            display: flex;
+            flex-direction: column;
+        }
+        
+        .terminal {
+            background: var(--bg-secondary);
+            border-radius: 8px;
+            padding: 1.5rem;
+            flex: 1;
+            display: flex;
+            flex-direction: column;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
+        }
+        
+        .output {
+            flex: 1;
+            overflow-y: auto;
+            font-family: 'Consolas', 'Monaco', monospace;
+            font-size: 0.875rem;
+            line-height: 1.6;
+            white-space: pre-wrap;
+            word-wrap: break-word;
+            margin-bottom: 1rem;
+            max-height: 500px;
+        }
+        
+        .command-line {
+            display: flex;
+            gap: 0.5rem;
+            align-items: center;
+        }
+        
+        .prompt {
+            color: var(--success);
+            font-family: monospace;
+        }
+        
+        #commandInput {
+            flex: 1;
+            background: var(--bg-primary);
+            border: 1px solid rgba(255,255,255,0.1);
+            color: var(--text-primary);
+            padding: 0.5rem;
+            border-radius: 4px;
+            font-family: monospace;
+            font-size: 0.875rem;
+        }
+        
+        #commandInput:focus {
+            outline: none;
+            border-color: var(--accent);
+        }
+        
+        button {
+            background: var(--accent);
+            color: white;
+            border: none;
+            padding: 0.5rem 1rem;
+            border-radius: 4px;
+            cursor: pointer;
+            font-weight: 500;
+            transition: background 0.2s;
+        }
+        
+        button:hover {
+            background: #2563eb;
+        }
+        
+        button:disabled {
+            background: var(--text-secondary);
+            cursor: not-allowed;
+        }
+        
+        .sidebar {
+            width: 300px;
+        }
+        
+        .panel {
+            background: var(--bg-secondary);
+            border-radius: 8px;
+            padding: 1.5rem;
+            margin-bottom: 1.5rem;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
+        }
+        
+        .panel h2 {
+            font-size: 1.125rem;
+            margin-bottom: 1rem;
+            color: var(--accent);
+        }
+        
+        .allowed-commands {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 0.5rem;
+        }
+        
+        .command-tag {
+            background: var(--bg-primary);
+            padding: 0.25rem 0.75rem;
+            border-radius: 4px;
+            font-size: 0.75rem;
+            font-family: monospace;
+            color: var(--text-secondary);
+            cursor: pointer;
+            transition: all 0.2s;
+        }
+        
+        .command-tag:hover {
+            color: var(--text-primary);
+            background: rgba(59, 130, 246, 0.2);
+        }
+        
+        .history-item {
+            padding: 0.5rem;
+            margin-bottom: 0.5rem;
+            background: var(--bg-primary);
+            border-radius: 4px;
+            font-size: 0.875rem;
+            cursor: pointer;
+            transition: background 0.2s;
+        }
+        
+        .history-item:hover {
+            background: rgba(59, 130, 246, 0.1);
+        }
+        
+        .history-command {
+            color: var(--text-primary);
+            font-family: monospace;
+        }
+        
+        .history-time {
+            color: var(--text-secondary);
+            font-size: 0.75rem;
+        }
+        
+        .success { color: var(--success); }
+        .error { color: var(--error); }
+        .warning { color: var(--warning); }
+        
+        .loading {
+            display: inline-block;
+            animation: spin 1s linear infinite;
+        }
+        
+        @keyframes spin {
+            from { transform: rotate(0deg); }
+            to { transform: rotate(360deg); }
+        }
+        
+        @media (max-width: 768px) {
+            main {
+                flex-direction: column;
+            }
+            .sidebar {
+                width: 100%;
+            }
+        }
+    </style>
+</head>
+<body>
+    <header>
+        <h1>🚀 MCP Noble Shell Server</h1>
+        <div class="stats">
+            <div class="stat">Session: <span id="sessionId">-</span></div>
+            <div class="stat">Commands: <span id="commandCount">0</span></div>
+            <div class="stat">Uptime: <span id="uptime">0s</span></div>
+        </div>
+    </header>
+    
+    <main>
+        <div class="terminal-section">
+            <div class="terminal">
+                <div class="output" id="output">Welcome to MCP Noble Shell Server!
+Type 'help' for available commands or click on any command tag.
+</div>
+                <div class="command-line">
+                    <span class="prompt">ubuntu@mcp:~$</span>
+                    <input type="text" id="commandInput" placeholder="Enter command..." autofocus>
+                    <button id="executeBtn" onclick="executeCommand()">Execute</button>
+                    <button onclick="clearTerminal()">Clear</button>
+                </div>
+            </div>
+        </div>
+        
+        <div class="sidebar">
+            <div class="panel">
+                <h2>📋 Allowed Commands</h2>
+                <div class="allowed-commands" id="allowedCommands"></div>
+            </div>
+            
+            <div class="panel">
+                <h2>📜 Command History</h2>
+                <div id="history"></div>
+            </div>
+            
+            <div class="panel">
+                <h2>⚡ Quick Actions</h2>
+                <button onclick="runCommand('uname -a')" style="width: 100%; margin-bottom: 0.5rem;">System Info</button>
+                <button onclick="runCommand('df -h')" style="width: 100%; margin-bottom: 0.5rem;">Disk Usage</button>
+                <button onclick="runCommand('free -h')" style="width: 100%; margin-bottom: 0.5rem;">Memory Usage</button>
+                <button onclick="runCommand('ps -eo pid,user,pcpu,pmem,comm --sort=-pcpu')" style="width: 100%;">Top Processes</button>
+            </div>
+        </div>
+    </main>
+    
+    <script>
+        let sessionId = null;
+        let commandHistory = [];
+        let historyIndex = -1;
+        let startTime = Date.now();
+        
+        // Initialize session
+        async function initSession() {
+            try {
+                const response = await fetch('/api/session', { method: 'POST' });
+                const data = await response.json();
+                sessionId = data.session_id;
+                document.getElementById('sessionId').textContent = sessionId.substring(0, 8) + '...';
+                localStorage.setItem('mcp_session', sessionId);
+            } catch (error) {
+                console.error('Failed to initialize session:', error);
+            }
+        }
+        
+        // Load configuration
+        async function loadConfig() {
+            try {
+                const response = await fetch('/api/config');
+                const data = await response.json();
+                const commands = data.allowed_commands.split(',');
+                const container = document.getElementById('allowedCommands');
+                container.innerHTML = commands.map(cmd => 
+                    `<div class="command-tag" onclick="runCommand('${cmd}')">${cmd}</div>`
+                ).join('');
+            } catch (error) {
+                console.error('Failed to load config:', error);
+            }
+        }
+        
+        // Execute command
+        async function executeCommand() {
+            const input = document.getElementById('commandInput');
+            const command = input.value.trim();
+            
+            if (!command) return;
+            
+            if (command === 'help') {
+                showHelp();
+                input.value = '';
+                return;
+            }
+            
+            if (command === 'clear') {
+                clearTerminal();
+                input.value = '';
+                return;
+            }
+            
+            const btn = document.getElementById('executeBtn');
+            btn.disabled = true;
+            btn.innerHTML = '<span class="loading">⚡</span> Running...';
+            
+            appendOutput(`$ ${command}`, 'prompt');
+            
+            try {
+                const formData = new URLSearchParams();
+                formData.append('command', command);
+                formData.append('session_id', sessionId);
+                
+                const response = await fetch('/execute', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/x-www-form-urlencoded',
+                    },
+                    body: formData
+                });
+                
+                const result = await response.json();
+                
+                if (result.success) {
+                    if (result.output) {
+                        appendOutput(result.output, 'success');
+                    }
+                    if (result.error) {
+                        appendOutput(result.error, 'warning');
+                    }
+                } else {
+                    appendOutput(`Error: ${result.error}`, 'error');
+                }
+                
+                // Update history
+                commandHistory.push(command);
+                historyIndex = commandHistory.length;
+                updateHistory();
+                updateStats();
+                
+            } catch (error) {
+                appendOutput(`Network error: ${error.message}`, 'error');
+            } finally {
+                btn.disabled = false;
+                btn.innerHTML = 'Execute';
+                input.value = '';
+                input.focus();
+            }
+        }
+        
+        // Helper functions
+        function appendOutput(text, className = '') {
+            const output = document.getElementById('output');
+            const line = document.createElement('div');
+            if (className) line.className = className;
+            line.textContent = text;
+            output.appendChild(line);
+            output.scrollTop = output.scrollHeight;
+        }
+        
+        function clearTerminal() {
+            document.getElementById('output').innerHTML = 'Terminal cleared.\\n';
+        }
+        
+        function runCommand(cmd) {
+            document.getElementById('commandInput').value = cmd;
+            executeCommand();
+        }
+        
+        function showHelp() {
+            appendOutput(`
+Available commands:
+  help     - Show this help message
+  clear    - Clear the terminal
+  [cmd]    - Execute any allowed shell command
+
+Keyboard shortcuts:
+  Enter    - Execute command
+  ↑/↓      - Navigate command history
+  Ctrl+L   - Clear terminal
+
+Click on any command tag to run it directly.
+            `, 'success');
+        }
+        
+        async function updateHistory() {
+            try {
+                const response = await fetch(`/api/history?session_id=${sessionId}`);
+                const data = await response.json();
+                const container = document.getElementById('history');
+                
+                container.innerHTML = data.history.slice(-5).reverse().map(item => `
+                    <div class="history-item" onclick="runCommand('${item.command}')">
+                        <div class="history-command">${item.command}</div>
+                        <div class="history-time">${new Date(item.timestamp).toLocaleTimeString()}</div>
+                    </div>
+                `).join('');
+            } catch (error) {
+                console.error('Failed to update history:', error);
+            }
+        }
+        
+        function updateStats() {
+            const count = parseInt(document.getElementById('commandCount').textContent) + 1;
+            document.getElementById('commandCount').textContent = count;
+        }
+        
+        function updateUptime() {
+            const elapsed = Math.floor((Date.now() - startTime) / 1000);
+            const hours = Math.floor(elapsed / 3600);
+            const minutes = Math.floor((elapsed % 3600) / 60);
+            const seconds = elapsed % 60;
+            
+            let uptime = '';
+            if (hours > 0) uptime += `${hours}h `;
+            if (minutes > 0) uptime += `${minutes}m `;
+            uptime += `${seconds}s`;
+            
+            document.getElementById('uptime').textContent = uptime;
+        }
+        
+        // Event listeners
+        document.getElementById('commandInput').addEventListener('keydown', (e) => {
+            if (e.key === 'Enter') {
+                executeCommand();
+            } else if (e.key === 'ArrowUp') {
+                e.preventDefault();
+                if (historyIndex > 0) {
+                    historyIndex--;
+                    e.target.value = commandHistory[historyIndex];
+                }
+            } else if (e.key === 'ArrowDown') {
+                e.preventDefault();
+                if (historyIndex < commandHistory.length - 1) {
+                    historyIndex++;
+                    e.target.value = commandHistory[historyIndex];
+                } else {
+                    historyIndex = commandHistory.length;
+                    e.target.value = '';
+                }
+            } else if (e.ctrlKey && e.key === 'l') {
+                e.preventDefault();
+                clearTerminal();
+            }
+        });
+        
+        // Initialize
+        window.onload = async () => {
+            await initSession();
+            await loadConfig();
+            setInterval(updateUptime, 1000);
+        };
+    </script>
+</body>
+</html>
+        '''
+
+ADVANCED_UI_BYTES = ADVANCED_UI_HTML.encode('utf-8')
+SIMPLE_UI_BYTES = SIMPLE_UI_HTML.encode('utf-8')
@@ -4,103 +4,312 @@ Enhanced MCP HTTP Server with Web UI
 An improved version of the MCP Noble HTTP server with better features and security
 """
 
+import base64
+import collections
+import gzip
+import hashlib
 import json
 import os
+import selectors
+import shlex
 import subprocess
 import sys
+import threading
 import time
-import secrets
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import parse_qs, urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, unquote_plus
+
+from _ui_static import ADVANCED_UI_BYTES
 
 # --- Configuration ---
 # Note: The 'config' dictionary provides default values.
 # The installer script creates a .env file that will override these.
 CONFIG_FILE = os.path.expanduser('~/.config/mcp/.env')
 SESSION_TIMEOUT = 3600  # 1 hour
+MAX_SESSIONS = 10_000
+REAP_INTERVAL = 60  # Seconds between sweeps for expired sessions
+KEEPALIVE_TIMEOUT = 15  # Idle seconds before a keep-alive connection is closed
+
+_config_cache = None  # (mtime, config) from the last load_config() call
 
 def load_config():
-    """Loads configuration from a .env file, falling back to defaults."""
+    """Loads configuration from a .env file, falling back to defaults.
+
+    The parsed result is cached against the file's mtime, so calling this
+    again is just a stat() unless the file has changed.
+    """
+    global _config_cache
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime
+    except OSError:
+        mtime = None
+    if _config_cache is not None and _config_cache[0] == mtime:
+        return _config_cache[1]
+
     config = {
         'ALLOWED_COMMANDS': 'ls,cat,pwd,grep,find,git,python3,node,npm,pip,curl,wget,wc,head,tail,ps,df,free,uname,whoami,date,echo,which',
         'COMMAND_TIMEOUT': '30',
         'MAX_OUTPUT_SIZE': '1048576',  # 1MB
         'RATE_LIMIT': '60',
         'AUTH_TOKEN': '',
-        'MCP_PORT': '8080'
+        'MCP_PORT': '8080',
+        'MAX_WORKERS': '8'
     }
     
-    if os.path.exists(CONFIG_FILE):
+    if mtime is not None:
         with open(CONFIG_FILE, 'r') as f:
             for line in f:
                 if '=' in line and not line.strip().startswith('#'):
                     key, value = line.strip().split('=', 1)
                     config[key.strip()] = value.strip().strip('"\'')
+    _config_cache = (mtime, config)
     return config
 
 CONFIG = load_config()
 IS_UNRESTRICTED = CONFIG.get('ALLOWED_COMMANDS') == '*'
+# Parsed once here rather than on every request
+ALLOWED_SET = frozenset(c.strip() for c in CONFIG.get('ALLOWED_COMMANDS', '').split(',') if c.strip())
+COMMAND_TIMEOUT = int(CONFIG.get('COMMAND_TIMEOUT', '30'))
+MAX_BODY = int(CONFIG.get('MAX_OUTPUT_SIZE', '1048576'))  # Caps request bodies and command output
+HOME = os.path.expanduser('~')
+MCP_HOST = CONFIG.get('MCP_HOST', '0.0.0.0')
+MCP_PORT = int(CONFIG.get('MCP_PORT', '8080'))
+
+# --- Command Execution ---
+# At most MAX_WORKERS commands run at once so a burst of clients can't fork without limit.
+# Each runs on its request's own thread; _run_cmd only waits on the child process.
+COMMAND_SLOTS = threading.BoundedSemaphore(int(CONFIG.get('MAX_WORKERS', '8')))
+
+def _run_cmd(args, timeout: int, cwd: str):
+    """Runs a command and returns (stdout, stderr, exit_code).
+
+    An argv list is exec'd directly; a plain string goes through /bin/sh.
+    Output is read as it arrives and each stream is capped at MAX_BODY bytes;
+    the command is killed once a cap is hit rather than buffered to completion.
+    Raises subprocess.TimeoutExpired if it runs past `timeout`.
+    """
+    try:
+        proc = subprocess.Popen(
+            args, shell=isinstance(args, str), cwd=cwd,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return '', f"{args[0]}: command not found\n", 127
+
+    out_buf, err_buf = bytearray(), bytearray()
+    bufs = {proc.stdout.fileno(): out_buf, proc.stderr.fileno(): err_buf}
+    truncated = False
+    deadline = time.monotonic() + timeout
+    try:
+        with selectors.DefaultSelector() as sel:
+            for fd in bufs:
+                sel.register(fd, selectors.EVENT_READ)
+            while sel.get_map() and not truncated:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    proc.kill()
+                    raise subprocess.TimeoutExpired(args, timeout)
+                for key, _ in sel.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        sel.unregister(key.fd)
+                        continue
+                    buf = bufs[key.fd]
+                    buf += chunk
+                    if len(buf) > MAX_BODY:
+                        del buf[MAX_BODY:]
+                        truncated = True
+        if truncated:
+            proc.kill()
+        try:
+            proc.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+        proc.wait()
+
+    out = out_buf.decode('utf-8', errors='replace')
+    err = err_buf.decode('utf-8', errors='replace')
+    if truncated:
+        err += f"\n... (output truncated at {MAX_BODY} bytes)\n"
+    return out, err, proc.returncode
 
 # --- Session Management ---
+_urandom = os.urandom
+_b64 = base64.urlsafe_b64encode
+
+def _session_key(session_id: str) -> bytes:
+    """Sessions are stored under a digest of their id, never the id itself.
+
+    Lookups then compare fixed-size digests, so response timing doesn't
+    reveal how much of a guessed id matched.
+    """
+    return hashlib.blake2b(session_id.encode(), digest_size=16).digest()
+
+class Session:
+    """One client session; slotted since many of these can be alive at once."""
+    __slots__ = ('created', 'last_access', 'history')
+
+    def __init__(self):
+        now = time.monotonic()
+        self.created = now
+        self.last_access = now
+        self.history = collections.deque(maxlen=50)  # Keeps the last 50 commands
+
 class SessionManager:
     """Manages user sessions and their command history."""
     def __init__(self):
-        self.sessions = {}
+        # Kept in least-recently-used order: validate_session moves hits to the end
+        self.sessions = collections.OrderedDict()
+        self.lock = threading.RLock()  # Handlers run one thread per connection
     
     def create_session(self) -> str:
-        session_id = secrets.token_urlsafe(16)
-        self.sessions[session_id] = {
-            'created': time.time(),
-            'last_access': time.time(),
-            'history': []
-        }
+        # Same 16 bytes of entropy and encoding as secrets.token_urlsafe(16)
+        session_id = _b64(_urandom(16)).rstrip(b'=').decode('ascii')
+        with self.lock:
+            if len(self.sessions) >= MAX_SESSIONS:
+                self._reap()
+            if len(self.sessions) >= MAX_SESSIONS:
+                # Still full of live sessions: evict the least recently used one
+                self.sessions.popitem(last=False)
+            self.sessions[_session_key(session_id)] = Session()
         return session_id
     
     def validate_session(self, session_id: str):
-        session = self.sessions.get(session_id)
-        if not session: return None
-        if time.time() - session['last_access'] > SESSION_TIMEOUT:
-            del self.sessions[session_id]
-            return None
-        session['last_access'] = time.time()
-        return session
+        if not session_id: return None
+        key = _session_key(session_id)
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None: return None
+            now = time.monotonic()
+            if now - session.last_access > self._ttl():
+                del self.sessions[key]
+                return None
+            session.last_access = now
+            self.sessions.move_to_end(key)
+            return session
+
+    def _ttl(self) -> float:
+        """Session lifetime, shortened as the store fills up (down to 10% when full)."""
+        memory_pressure = min(len(self.sessions) / MAX_SESSIONS, 1.0)
+        return SESSION_TIMEOUT * (1 - 0.9 * memory_pressure)
+
+    def _reap(self):
+        """Drops every expired session; they all sit at the LRU end of the store."""
+        with self.lock:
+            now, ttl = time.monotonic(), self._ttl()
+            while self.sessions:
+                oldest = next(iter(self.sessions.values()))
+                if now - oldest.last_access <= ttl:
+                    break
+                self.sessions.popitem(last=False)
+
+    def start_reaper(self):
+        """Sweeps expired sessions every REAP_INTERVAL seconds on a daemon timer."""
+        def tick():
+            self._reap()
+            self.start_reaper()
+        timer = threading.Timer(REAP_INTERVAL, tick)
+        timer.daemon = True
+        timer.start()
         
-    def add_command(self, session_id: str, command: str, result: dict):
-        session = self.validate_session(session_id)
-        if session:
-            session['history'].append({
-                'timestamp': datetime.now().isoformat(),
+    def add_command(self, session: Session, command: str, result: dict):
+        """Records a command on a session the caller has already validated."""
+        with self.lock:
+            session.history.append({
+                'ts': time.time(),  # Formatted lazily by history_view()
                 'command': command,
                 'result': result
             })
-            session['history'] = session['history'][-50:] # Keep last 50 commands
+
+    def history_view(self, session: Session) -> list:
+        """Returns the session history with ISO timestamps, as served by the API."""
+        with self.lock:  # A deque can't be iterated while another thread appends
+            history = list(session.history)
+        return [
+            {'timestamp': datetime.fromtimestamp(h['ts']).isoformat(), 'command': h['command'], 'result': h['result']}
+            for h in history
+        ]
 
 session_manager = SessionManager()
 
+# --- Server ---
+class MCPHTTPServer(ThreadingHTTPServer):
+    """Serves each connection on its own thread so slow commands don't block others."""
+    daemon_threads = True  # Don't wait on in-flight requests when exiting
+    allow_reuse_address = True
+
+# --- Web UI ---
+WEB_UI_BYTES = ADVANCED_UI_BYTES
+WEB_UI_LEN = str(len(WEB_UI_BYTES))
+
+def _parse_form(body: bytes) -> dict:
+    """Decodes a urlencoded body into {key: first value}, like parse_qs without the lists."""
+    out = {}
+    for pair in body.split(b'&'):
+        k, _, v = pair.partition(b'=')
+        if k and v:
+            out.setdefault(unquote_plus(k.decode('utf-8')), unquote_plus(v.decode('utf-8')))
+    return out
+
+# Shared compact encoder for every JSON response
+_JSON = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
 # --- Core HTTP Handler ---
 class MCPHTTPHandler(BaseHTTPRequestHandler):
     """Handles all incoming HTTP requests."""
+    # Keep-alive lets the UI reuse one connection for execute + history calls;
+    # every response therefore has to carry a Content-Length.
+    protocol_version = "HTTP/1.1"
+    rbufsize = -1
+    wbufsize = -1  # Buffered; flushed once per response
+    timeout = KEEPALIVE_TIMEOUT  # Otherwise an idle keep-alive socket holds its thread forever
     
     # --- Request Routing ---
+    # Built once per class; values are method names resolved on the instance.
+    _GET_ROUTES = {
+        '/': 'serve_web_ui',
+        '/api/config': 'serve_api_config',
+        '/api/history': 'serve_api_history'
+    }
+    _POST_ROUTES = {
+        '/api/execute': 'serve_api_execute',
+        '/api/session': 'serve_api_session'
+    }
+    _READS_BODY = frozenset({'serve_api_execute'})  # Every other POST body is discarded
+
     def do_GET(self):
-        routes = {
-            '/': self.serve_web_ui,
-            '/api/config': self.serve_api_config,
-            '/api/history': self.serve_api_history
-        }
-        handler = routes.get(urlparse(self.path).path)
-        if handler: handler()
-        else: self.send_error(404, "Not Found")
+        self._dispatch(self._GET_ROUTES)
     
     def do_POST(self):
-        routes = {
-            '/api/execute': self.serve_api_execute,
-            '/api/session': self.serve_api_session
-        }
-        handler = routes.get(urlparse(self.path).path)
-        if handler: handler()
-        else: self.send_error(404, "Not Found")
+        self._dispatch(self._POST_ROUTES)
+
+    def _dispatch(self, routes):
+        p = self.path
+        q = p.find('?')
+        name = routes.get(p if q < 0 else p[:q])
+        if not name: return self.send_error(404, "Not Found")
+        if self.command == 'POST' and name not in self._READS_BODY:
+            self._discard_body()
+        getattr(self, name)()
+
+    def _discard_body(self):
+        """Skips an unused request body so it isn't parsed as the next keep-alive request."""
+        length = self.headers.get('Content-Length', '0').strip()
+        if not (length.isascii() and length.isdigit()) or int(length) > MAX_BODY \
+                or 'Transfer-Encoding' in self.headers:
+            self.close_connection = True  # Can't skip it reliably; send_json says so
+        else:
+            self.rfile.read(int(length))
+
+    def query_param(self, name: str):
+        """Parses the query string on demand; only a few endpoints need it."""
+        _, _, query = self.path.partition('?')
+        return parse_qs(query).get(name, [None])[0]
 
     # --- API Endpoints ---
     def serve_api_session(self):
@@ -110,92 +319,107 @@ class MCPHTTPHandler(BaseHTTPRequestHandler):
         self.send_json({'allowed_commands': CONFIG.get('ALLOWED_COMMANDS')})
     
     def serve_api_history(self):
-        session_id = parse_qs(urlparse(self.path).query).get('session_id', [None])[0]
+        session_id = self.query_param('session_id')
         session = session_manager.validate_session(session_id)
         if not session: return self.send_error(403, "Invalid session")
-        self.send_json(session['history'])
+        self.send_json(session_manager.history_view(session))
 
     def serve_api_execute(self):
         try:
-            content_length = int(self.headers['Content-Length'])
+            try:
+                content_length = int(self.headers.get('Content-Length', '0'))
+            except ValueError:
+                self.close_connection = True
+                return self.send_json({'error': 'Invalid Content-Length'}, status=400)
+            if content_length <= 0 or content_length > MAX_BODY:
+                # The unread body would desync the next keep-alive request
+                self.close_connection = True
+                return self.send_json({'error': 'Request body is empty or too large'}, status=413)
             post_data = self.rfile.read(content_length)
-            params = parse_qs(post_data.decode('utf-8'))
-            command = params.get('command', [''])[0]
-            session_id = params.get('session_id', [''])[0]
+            params = _parse_form(post_data)
+            command = params.get('command', '')
+            session_id = params.get('session_id', '')
 
-            if not session_manager.validate_session(session_id):
+            session = session_manager.validate_session(session_id)
+            if not session:
                 return self.send_json({'error': 'Invalid or expired session'}, status=403)
             
-            if not command:
-                return self.send_json({'error': 'Command cannot be empty'}, status=400)
-            
             # Security Check
-            command_base = command.split()[0]
-            if not IS_UNRESTRICTED and command_base not in CONFIG.get('ALLOWED_COMMANDS').split(','):
-                err_msg = f"Command '{command_base}' is not allowed."
-                result = {'success': False, 'error': err_msg, 'output': '', 'exit_code': -1, 'command': command}
-                session_manager.add_command(session_id, command, result)
-                return self.send_json(result, status=403)
+            if IS_UNRESTRICTED:
+                # The raw string goes to /bin/sh, so it's only checked for being empty
+                if not command.strip():
+                    return self.send_json({'error': 'Command cannot be empty'}, status=400)
+                args = command
+            else:
+                try:
+                    args = shlex.split(command)
+                except ValueError as e:
+                    return self.send_json({'error': f'Could not parse command: {e}'}, status=400)
+                if not args:
+                    return self.send_json({'error': 'Command cannot be empty'}, status=400)
+                # Restricted commands are exec'd without a shell, so only argv[0] ever runs.
+                if args[0] not in ALLOWED_SET:
+                    return self._command_failed(session, command, f"Command '{args[0]}' is not allowed.", 403)
 
             # Execute Command
-            timeout = int(CONFIG.get('COMMAND_TIMEOUT'))
-            proc = subprocess.run(
-                command, shell=True, capture_output=True, 
-                text=True, timeout=timeout, cwd=os.path.expanduser('~')
-            )
+            if not COMMAND_SLOTS.acquire(timeout=COMMAND_TIMEOUT):
+                err_msg = "Server busy: all command slots are in use, try again shortly."
+                return self._command_failed(session, command, err_msg, 503)
+            try:
+                out, err, rc = _run_cmd(args, COMMAND_TIMEOUT, HOME)
+            except subprocess.TimeoutExpired:
+                err_msg = f"Command timed out after {COMMAND_TIMEOUT} seconds."
+                return self._command_failed(session, command, err_msg, 504)
+            finally:
+                COMMAND_SLOTS.release()
             
-            result = {'success': True, 'command': command, 'output': proc.stdout, 'error': proc.stderr, 'exit_code': proc.returncode}
-            session_manager.add_command(session_id, command, result)
+            result = {'success': True, 'command': command, 'output': out, 'error': err, 'exit_code': rc}
+            session_manager.add_command(session, command, result)
             self.send_json(result)
 
         except Exception as e:
             self.send_json({'error': f'Server Execution Error: {str(e)}'}, status=500)
 
+    def _command_failed(self, session: Session, command: str, err_msg: str, status: int):
+        """Records a command that didn't run and sends the error result."""
+        result = {'success': False, 'error': err_msg, 'output': '', 'exit_code': -1, 'command': command}
+        session_manager.add_command(session, command, result)
+        self.send_json(result, status=status)
+
     # --- Web UI ---
     def serve_web_ui(self):
         self.send_response(200)
         self.send_header('Content-Type', 'text/html; charset=utf-8')
-        self.end_headers()
-        html_content = """
-<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>MCP Shell</title><style>
-body{font-family:monospace;background-color:#1e1e1e;color:#d4d4d4;display:flex;flex-direction:column;height:100vh;margin:0}
-#header{padding:1rem;background-color:#252526;border-bottom:1px solid #333;display:flex;justify-content:space-between;align-items:center}
-#main{display:flex;flex:1;overflow:hidden}
-#sidebar{width:300px;background-color:#252526;padding:1rem;overflow-y:auto;border-right:1px solid #333}
-#content{flex:1;padding:1rem;display:flex;flex-direction:column}
-#output{flex:1;background-color:#1e1e1e;padding:1rem;overflow-y:auto;white-space:pre-wrap;margin-bottom:1rem;border-radius:4px;border:1px solid #333}
-#input-form{display:flex;gap:0.5rem}#command-input{flex:1;background-color:#3c3c3c;color:#d4d4d4;border:1px solid #3c3c3c;padding:0.5rem;border-radius:4px}
-#history-list{list-style:none;padding:0}#history-list li{padding:0.5rem;cursor:pointer;border-radius:4px;margin-bottom:5px;word-break:break-all}#history-list li:hover{background-color:#3c3c3c}
-.prompt{color:#608b4e}.error{color:#f44747}.command-echo{color:#569cd6;font-weight:bold}
-.exit-code-success{color:#4ec9b0}.exit-code-fail{color:#f44747}
-</style></head><body><div id="header"><h1>MCP Shell Server</h1><div id="session-info"></div></div>
-<div id="main"><div id="sidebar"><h2>History</h2><ul id="history-list"></ul></div>
-<div id="content"><div id="output"></div><form id="input-form" onsubmit="sendCommand(event)">
-<span class="prompt">$&nbsp;</span><input id="command-input" type="text" autocomplete="off" autofocus/>
-</form></div></div><script>
-let sessionId;
-const outputEl=document.getElementById('output');const historyEl=document.getElementById('history-list');const inputEl=document.getElementById('command-input');
-async function initSession(){const r=await fetch('/api/session',{method:'POST'});const d=await r.json();sessionId=d.session_id;document.getElementById('session-info').innerText=`Session: ${sessionId.substring(0,8)}`}
-async function sendCommand(e){e.preventDefault();const c=inputEl.value.trim();if(!c)return;
-appendOutput('$ '+c, 'command-echo');inputEl.value='';
-const f=new URLSearchParams();f.append('command',c);f.append('session_id',sessionId);
-try{const r=await fetch('/api/execute',{method:'POST',body:f});const d=await r.json();
-if(d.output)appendOutput(d.output);if(d.error)appendOutput(d.error,'error');
-appendOutput(`Exit Code: ${d.exit_code}`, d.exit_code===0 ? 'exit-code-success' : 'exit-code-fail');
-updateHistory();}catch(e){appendOutput('Network Error: '+e,'error')}finally{outputEl.scrollTop=outputEl.scrollHeight;}}
-function appendOutput(text,className=''){const d=document.createElement('div');if(className)d.className=className;d.textContent=text;outputEl.appendChild(d);}
-async function updateHistory(){const r=await fetch(`/api/history?session_id=${sessionId}`);const h=await r.json();
-historyEl.innerHTML='';h.reverse().forEach(item=>{const l=document.createElement('li');l.textContent=item.command;l.onclick=()=>{inputEl.value=item.command;inputEl.focus()};historyEl.appendChild(l)});};
-window.onload=initSession;
-</script></body></html>"""
-        self.wfile.write(html_content.encode('utf-8'))
+        self.send_header('Content-Length', WEB_UI_LEN)
+        self.send_header('Cache-Control', 'public, max-age=3600')
+        self.end_headers(WEB_UI_BYTES)
 
     # --- Helper Methods ---
+    def end_headers(self, body: bytes = b''):
+        """Ends the headers, writing them and an optional body in a single wfile.write."""
+        if self.request_version == 'HTTP/0.9':
+            self.wfile.write(body)
+            return
+        self._headers_buffer.append(b"\r\n")
+        self._headers_buffer.append(body)
+        self.flush_headers()
+
     def send_json(self, data, status=200):
+        body = _JSON(data).encode('utf-8')
+        # Command output compresses well; level 1 keeps the CPU cost negligible
+        gzipped = len(body) > 512 and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = gzip.compress(body, compresslevel=1)
         self.send_response(status)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers(body)
+        self.wfile.flush()
 
     def log_message(self, format, *args):
         # Override to suppress default logging to stderr for a cleaner console
@@ -203,15 +427,14 @@ window.onload=initSession;
 
 # --- Main Execution ---
 def main():
-    host = CONFIG.get('MCP_HOST', '0.0.0.0')
-    port = int(CONFIG.get('MCP_PORT', '8080'))
-    server_address = (host, port)
+    server_address = (MCP_HOST, MCP_PORT)
     
     mode = "UNRESTRICTED" if IS_UNRESTRICTED else "RESTRICTED"
-    print(f"Starting MCP Server ({mode} MODE) on port {port}...")
+    print(f"Starting MCP Server ({mode} MODE) on port {MCP_PORT}...")
     
     try:
-        httpd = HTTPServer(server_address, MCPHTTPHandler)
+        httpd = MCPHTTPServer(server_address, MCPHTTPHandler)
+        session_manager.start_reaper()
         httpd.serve_forever()
     except Exception as e:
         print(f"❌ Fatal error starting server: {e}", file=sys.stderr)
@@ -205,7 +205,7 @@ backup_existing() {
         mkdir -p "$backup_path"
         
         # Backup existing files
-        for file in .env simple_http_server.py mcp_server_wrapper.py; do
+        for file in .env simple_http_server.py _ui_static.py mcp_server_wrapper.py; do
             if [[ -f "$INSTALL_DIR/$file" ]]; then
                 cp "$INSTALL_DIR/$file" "$backup_path/"
                 info "Backed up: $file"
@@ -234,6 +234,7 @@ install_python_packages() {
         "mcp"
         "aiohttp"
         "python-dotenv"
+        "orjson"
     )
     
     for package in "${packages[@]}"; do
@@ -280,13 +281,15 @@ EOF
 install_scripts() {
     step "Installing MCP scripts..."
     
-    # Install enhanced HTTP server
-    if [[ -f "$SCRIPT_DIR/simple_http_server.py" ]]; then
-        cp "$SCRIPT_DIR/simple_http_server.py" "$INSTALL_DIR/"
-    else
-        # Download from repo if not found locally
-        curl -fsSL "$REPO_URL/raw/main/simple_http_server.py" -o "$INSTALL_DIR/simple_http_server.py"
-    fi
+    # Install enhanced HTTP server and its web UI module
+    for file in simple_http_server.py _ui_static.py; do
+        if [[ -f "$SCRIPT_DIR/$file" ]]; then
+            cp "$SCRIPT_DIR/$file" "$INSTALL_DIR/"
+        else
+            # Download from repo if not found locally
+            curl -fsSL "$REPO_URL/raw/main/$file" -o "$INSTALL_DIR/$file"
+        fi
+    done
     chmod +x "$INSTALL_DIR/simple_http_server.py"
     
     # Create start script
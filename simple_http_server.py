@@ -5,142 +5,486 @@ An improved version of the MCP Noble HTTP server with better features and securi
 """
 
 import asyncio
+import collections
+import gzip
+import itertools
 import json
+import http.client
 import os
+import re
+import shlex
+import socket
 import subprocess
 import sys
+import threading
 import time
 import uuid
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import parse_qs, urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, unquote_plus, urlparse
 import html
 import hashlib
 import hmac
 import secrets
+import selectors
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder is used when it's absent
+    orjson = None
+
+from _ui_static import SIMPLE_UI_BYTES
+
 # Configuration
 DEFAULT_PORT = 8080
 DEFAULT_HOST = '0.0.0.0'
 CONFIG_FILE = os.path.expanduser('~/.config/mcp/.env')
 SESSION_TIMEOUT = 3600  # 1 hour
+KEEPALIVE_TIMEOUT = 15  # Idle seconds before a keep-alive connection is closed
+MAX_WORKERS = (os.cpu_count() or 1) * 4  # Commands run concurrently
+BODY_BUF_SIZE = 8192  # Form bodies up to this size reuse a per-connection buffer
+
+# JSON encoding straight to bytes
+if orjson is not None:
+    dumps = orjson.dumps
+else:
+    def dumps(data) -> bytes:
+        return json.dumps(data).encode()
 
 # Load environment variables
+# KEY=value lines; a matching pair of quotes around the value is dropped
+_ENV_RE = re.compile(r'^[ \t]*([A-Za-z_]\w*)=(["\']?)(.*?)\2[ \t\r]*$', re.M)
+_INT_DEFAULTS = {
+    'COMMAND_TIMEOUT': 30,
+    'MAX_OUTPUT_SIZE': 1048576,  # 1MB
+    'RATE_LIMIT': 60,  # requests per minute
+}
+
 def load_config():
     config = {
         'ALLOWED_COMMANDS': 'ls,cat,pwd,grep,find,git,python3,node,npm,pip,curl,wget,wc,head,tail,ps,df,free,uname,whoami,date,echo,which',
-        'COMMAND_TIMEOUT': '30',
-        'MAX_OUTPUT_SIZE': '1048576',  # 1MB
-        'RATE_LIMIT': '60',  # requests per minute
         'AUTH_TOKEN': '',  # Optional authentication token
+        **_INT_DEFAULTS,
     }
     
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, 'r') as f:
-            for line in f:
-                if '=' in line and not line.strip().startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    config[key] = value.strip('"\'')
+            config.update((key, value) for key, _, value in _ENV_RE.findall(f.read()))
+    
+    # Numeric settings are converted once here, not on every request
+    for key, default in _INT_DEFAULTS.items():
+        try:
+            config[key] = int(config[key])
+        except ValueError:
+            print(f"⚠️  Invalid {key} {config[key]!r} in {CONFIG_FILE}, using {default}")
+            config[key] = default
     
     return config
 
 CONFIG = load_config()
 
+# Hot-path lookups, derived from CONFIG once at startup
+ALLOWED_COMMANDS = [c.strip() for c in CONFIG.get('ALLOWED_COMMANDS', '').split(',')]
+ALLOWED_SET = frozenset(ALLOWED_COMMANDS)
+COMMAND_TIMEOUT = CONFIG['COMMAND_TIMEOUT']
+MAX_OUTPUT_SIZE = CONFIG['MAX_OUTPUT_SIZE']
+RATE_LIMIT = CONFIG['RATE_LIMIT']
+HOME_DIR = os.path.expanduser('~')
+EXEC_ENV = {**os.environ, 'PATH': '/usr/local/bin:/usr/bin:/bin'}
+# CONFIG doesn't change after startup, so /api/config is encoded once
+CONFIG_JSON_BYTES = dumps({
+    'allowed_commands': CONFIG['ALLOWED_COMMANDS'],
+    'command_timeout': COMMAND_TIMEOUT,
+    'max_output_size': MAX_OUTPUT_SIZE,
+    'rate_limit': RATE_LIMIT
+})
+CONFIG_ETAG = f'W/"config-{hashlib.blake2b(CONFIG_JSON_BYTES, digest_size=8).hexdigest()}"'
+
+# Caps concurrently running commands; cheap endpoints never wait on it
+COMMAND_SLOTS = threading.BoundedSemaphore(MAX_WORKERS)
+
+def run_command(argv: List[str], timeout: int, max_output: int) -> Tuple[str, str, int]:
+    """Run an allow-listed command and return (stdout, stderr, exit_code).
+    
+    Both pipes are read as output arrives; once either stream passes
+    max_output bytes the child is killed, so a runaway command never gets
+    buffered in full. Raises subprocess.TimeoutExpired past `timeout`.
+    """
+    # Exec the binary directly; no /bin/sh fork per request.
+    # Python opens fds non-inheritable (PEP 446), so skip the close sweep
+    process = subprocess.Popen(
+        argv, shell=False, cwd=HOME_DIR, env=EXEC_ENV, close_fds=False,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stdout, stderr = bytearray(), bytearray()
+    buffers = {process.stdout.fileno(): stdout, process.stderr.fileno(): stderr}
+    truncated = False
+    deadline = time.monotonic() + timeout
+    try:
+        with selectors.DefaultSelector() as sel:
+            for fd in buffers:
+                sel.register(fd, selectors.EVENT_READ)
+            while sel.get_map() and not truncated:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(argv, timeout)
+                for key, _ in sel.select(remaining):
+                    buf = buffers[key.fd]
+                    chunk = os.read(key.fd, max_output + 1 - len(buf))
+                    if not chunk:
+                        sel.unregister(key.fd)
+                    else:
+                        buf += chunk
+                        truncated = truncated or len(buf) > max_output
+        if truncated:
+            process.kill()
+        process.wait(timeout=max(deadline - time.monotonic(), 0))
+    finally:
+        # No-op if it already exited; otherwise don't leave it running
+        process.kill()
+        process.stdout.close()
+        process.stderr.close()
+        process.wait()
+    
+    out = stdout[:max_output].decode('utf-8', 'replace')
+    err = stderr[:max_output].decode('utf-8', 'replace')
+    if len(stdout) > max_output:
+        out += f"\\n... (output truncated at {max_output} bytes)"
+    if len(stderr) > max_output:
+        err += f"\\n... (error output truncated at {max_output} bytes)"
+    return out, err, process.returncode
+DANGEROUS_PATTERNS = ['..', '~/', '/etc/', '/root/', '$(', '${', '`', ';rm', ';sudo']
+DANGEROUS_RE = re.compile('|'.join(re.escape(p) for p in DANGEROUS_PATTERNS))
+
+# Wall-clock strings, rebuilt at most once per second
+_clock_cache = (None, '', '')  # (epoch second, ISO timestamp, log timestamp)
+
+def _wall_clock() -> Tuple[int, str, str]:
+    global _clock_cache
+    second = int(time.time())
+    cache = _clock_cache
+    if cache[0] != second:
+        dt = datetime.fromtimestamp(second)
+        cache = _clock_cache = (second, dt.isoformat(), dt.strftime('%Y-%m-%d %H:%M:%S'))
+    return cache
+
+def now_iso() -> str:
+    """Current local time as an ISO string, at one-second resolution"""
+    return _wall_clock()[1]
+
 # Session management
 class SessionManager:
+    SWEEP_INTERVAL = 60  # Seconds between sweeps of expired sessions
+    ACTIVE_WINDOW = 300  # Sessions used this recently count as active
+    
     def __init__(self):
         self.sessions = {}
         self.command_history = {}
+        # History deques of reaped sessions, cleared and handed to new ones.
+        # Session dicts aren't pooled: a request that looked one up before the
+        # sweep could otherwise see it revived under a new id.
+        self._pool = collections.deque(maxlen=1024)
+        # Running totals for /api/stats, so it never scans every session
+        self.total_commands = 0
+        self.active_count = 0  # Recounted each sweep, bumped by create_session
+        self._stats_lock = threading.Lock()
+        threading.Thread(target=self._sweeper, name='session-sweeper', daemon=True).start()
+    
+    def _sweeper(self):
+        """Drops sessions idle past SESSION_TIMEOUT, including ones nobody revisits."""
+        while True:
+            time.sleep(self.SWEEP_INTERVAL)
+            now = time.monotonic()
+            sessions = list(self.sessions.items())
+            cutoff = now - SESSION_TIMEOUT
+            dead = [k for k, v in sessions if v['last_access'] < cutoff]
+            active_cutoff = now - self.ACTIVE_WINDOW
+            active = sum(1 for _, v in sessions if v['last_access'] > active_cutoff)
+            with self._stats_lock:
+                self.active_count = active
+            for session_id in dead:
+                self.sessions.pop(session_id, None)
+                history = self.command_history.pop(session_id, None)
+                if history is not None:
+                    history.clear()
+                    self._pool.append(history)
     
     def create_session(self) -> str:
         session_id = secrets.token_urlsafe(32)
+        now = time.monotonic()
         self.sessions[session_id] = {
-            'created': time.time(),
-            'last_access': time.time(),
-            'commands_run': 0
+            'created': now,
+            'last_access': now,
+            'commands_run': 0,
+            'lock': threading.Lock()  # Guards commands_run only
         }
-        self.command_history[session_id] = []
+        try:
+            history = self._pool.pop()
+        except IndexError:
+            # deque appends are thread-safe and evict the oldest entry in O(1)
+            history = collections.deque(maxlen=100)
+        self.command_history[session_id] = history
+        with self._stats_lock:
+            self.active_count += 1
         return session_id
     
     def validate_session(self, session_id: str) -> bool:
-        if session_id not in self.sessions:
+        session = self.sessions.get(session_id)
+        if session is None:
             return False
         
-        session = self.sessions[session_id]
-        if time.time() - session['last_access'] > SESSION_TIMEOUT:
-            del self.sessions[session_id]
-            if session_id in self.command_history:
-                del self.command_history[session_id]
+        now = time.monotonic()
+        if now - session['last_access'] > SESSION_TIMEOUT:
+            # pop() rather than del: another request thread may expire it first
+            self.sessions.pop(session_id, None)
+            self.command_history.pop(session_id, None)
             return False
         
-        session['last_access'] = time.time()
+        session['last_access'] = now
         return True
     
     def add_command(self, session_id: str, command: str, result: dict):
-        if session_id in self.command_history:
-            self.command_history[session_id].append({
-                'timestamp': datetime.now().isoformat(),
+        history = self.command_history.get(session_id)
+        session = self.sessions.get(session_id)
+        if history is not None and session is not None:
+            # maxlen keeps only the last 100 commands
+            history.append({
+                'timestamp': now_iso(),
                 'command': command,
                 'result': result
             })
-            # Keep only last 100 commands
-            if len(self.command_history[session_id]) > 100:
-                self.command_history[session_id].pop(0)
             
-            self.sessions[session_id]['commands_run'] += 1
+            with session['lock']:
+                session['commands_run'] += 1
+            with self._stats_lock:
+                self.total_commands += 1
+    
+    def recent_commands(self, session_id: str, n: int) -> list:
+        """Returns the last n history entries for a session, oldest first."""
+        history = self.command_history.get(session_id, ())
+        return list(itertools.islice(history, max(0, len(history) - n), None))
 
 session_manager = SessionManager()
 
 # Rate limiting
 class RateLimiter:
+    """Sliding-window limiter kept as two per-minute counters per client.
+
+    The rate is estimated as prev * (share of the previous window still
+    inside the last 60s) + curr, so each client costs one small list
+    instead of a timestamp per request.
+    """
+    WINDOW = 60
+    
     def __init__(self, limit: int = 60):
         self.limit = limit
-        self.requests = {}
+        self.requests = {}  # client_ip -> [window_start, curr_count, prev_count]
+        threading.Thread(target=self._sweeper, name='ratelimit-sweeper', daemon=True).start()
     
     def is_allowed(self, client_ip: str) -> bool:
-        now = time.time()
-        minute_ago = now - 60
-        
-        if client_ip not in self.requests:
-            self.requests[client_ip] = []
-        
-        # Clean old requests
-        self.requests[client_ip] = [t for t in self.requests[client_ip] if t > minute_ago]
-        
-        if len(self.requests[client_ip]) >= self.limit:
+        now = time.monotonic()
+        window = int(now // self.WINDOW)
+        
+        entry = self.requests.get(client_ip)
+        if entry is None:
+            entry = self.requests[client_ip] = [window, 0, 0]
+        elif window != entry[0]:
+            # Roll forward; anything older than the previous window is dropped
+            entry[2] = entry[1] if window - entry[0] == 1 else 0
+            entry[1] = 0
+            entry[0] = window
+        
+        elapsed = (now % self.WINDOW) / self.WINDOW
+        if entry[2] * (1 - elapsed) + entry[1] >= self.limit:
             return False
         
-        self.requests[client_ip].append(now)
+        entry[1] += 1
         return True
+    
+    def _sweeper(self):
+        """Forgets clients with no requests in the last two windows."""
+        while True:
+            time.sleep(self.WINDOW)
+            window = int(time.monotonic() // self.WINDOW)
+            for ip, entry in list(self.requests.items()):
+                if window - entry[0] >= 2:
+                    self.requests.pop(ip, None)
+
+rate_limiter = RateLimiter(RATE_LIMIT)
+
+# Web interface
+WEB_UI_BYTES = SIMPLE_UI_BYTES
+WEB_UI_GZIP = gzip.compress(WEB_UI_BYTES, 9)  # Compressed once, so spend the CPU on level 9
+
+def parse_form(body, length: Optional[int] = None) -> Dict[bytes, bytes]:
+    """Split a urlencoded body into raw {key: value} pairs (first value wins).
+    
+    body may be a reused buffer, in which case only its first length bytes
+    are parsed. Values stay percent-encoded bytes; callers decode only the
+    fields they use with form_value().
+    """
+    if length is None:
+        length = len(body)
+    form = {}
+    start = 0
+    with memoryview(body) as view:
+        while start < length:
+            end = body.find(b'&', start, length)
+            if end < 0:
+                end = length
+            eq = body.find(b'=', start, end)
+            if start < eq < end - 1:
+                form.setdefault(view[start:eq].tobytes(), view[eq + 1:end].tobytes())
+            start = end + 1
+    return form
 
-rate_limiter = RateLimiter(int(CONFIG.get('RATE_LIMIT', '60')))
+def form_value(form: Dict[bytes, bytes], key: bytes) -> str:
+    """Decode one field from parse_form(), '' if absent"""
+    return unquote_plus(form.get(key, b'').decode('utf-8'))
+
+# Fast-path request parsing
+_CONTENT_LENGTH_RE = re.compile(rb'\r\ncontent-length:[ \t]*(\d+)[ \t]*\r\n', re.I)
+_ANY_CONTENT_LENGTH_RE = re.compile(rb'\r\ncontent-length:', re.I)
+# Requests that need the stdlib parser's header handling
+_SLOW_HEADERS_RE = re.compile(rb'\r\n(?:expect|transfer-encoding):', re.I)
+_CONNECTION_RE = re.compile(rb'\r\nconnection:[ \t]*(close|keep-alive)', re.I)
 
 # Enhanced request handler
 class MCPHTTPHandler(BaseHTTPRequestHandler):
+    # Reuse connections across UI requests; all responses send Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Buffered writer: headers and body leave in one send() when the
+    # request is flushed, rather than one syscall per write
+    wbufsize = -1
+    # Idle keep-alive connections would otherwise hold their thread forever
+    timeout = KEEPALIVE_TIMEOUT
+    _GET_ROUTES = {
+        '/': 'serve_web_ui',
+        '/health': 'serve_health',
+        '/api/config': 'serve_config',
+        '/api/history': 'serve_history',
+        '/api/stats': 'serve_stats',
+    }
+    _POST_ROUTES = {
+        '/execute': 'handle_execute',
+        '/api/session': 'handle_session',
+    }
+    _FAST_POST_PATHS = frozenset(p.encode() for p in _POST_ROUTES)
+    
+    def setup(self):
+        super().setup()
+        # Each response goes out in one write; don't let Nagle hold it back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Form bodies are read into this per-connection buffer, not fresh bytes
+        self._body_buf = bytearray(BODY_BUF_SIZE)
+    
+    def end_headers(self, body: bytes = b''):
+        """End the headers and write them together with an optional body"""
+        if self.request_version == 'HTTP/0.9':
+            self.wfile.write(body)
+            return
+        self._headers_buffer.append(b'\r\n')
+        self._headers_buffer.append(body)
+        self.flush_headers()
+    
+    def handle_one_request(self):
+        """Handle one request, skipping full header parsing for form POSTs"""
+        self._content_length = None
+        try:
+            if self._handle_fast_post():
+                return
+        except TimeoutError as e:
+            self.log_error("Request timed out: %r", e)
+            self.close_connection = True
+            return
+        super().handle_one_request()
+    
+    def _handle_fast_post(self) -> bool:
+        """Serve a POST to a known route straight from the buffered request head.
+        
+        Only the request line, Content-Length and Connection are looked at;
+        self.headers is left empty. Returns False, having consumed nothing,
+        whenever the stdlib parser should handle the request instead.
+        """
+        buffered = self.rfile.peek()
+        if not buffered.startswith(b'POST '):
+            return False
+        end = buffered.find(b'\r\n\r\n')
+        if end < 0:
+            return False  # Head not fully buffered yet
+        head = buffered[:end + 2]
+        parts = head[:head.find(b'\r\n')].split(b' ')
+        if (len(parts) != 3 or parts[1] not in self._FAST_POST_PATHS
+                or parts[2] not in (b'HTTP/1.0', b'HTTP/1.1')
+                or _SLOW_HEADERS_RE.search(head)):
+            return False
+        match = _CONTENT_LENGTH_RE.search(head)
+        if match is None and _ANY_CONTENT_LENGTH_RE.search(head):
+            return False  # Malformed length; the slow path rejects it
+        
+        self.rfile.read(end + 4)
+        self.raw_requestline = head[:head.find(b'\r\n') + 2]
+        self.requestline = self.raw_requestline.decode('latin-1').rstrip('\r\n')
+        self.command, self.path, self.request_version = (p.decode('latin-1') for p in parts)
+        self.headers = http.client.HTTPMessage()
+        self._content_length = int(match.group(1)) if match else 0
+        conn = _CONNECTION_RE.search(head)
+        conn = conn.group(1).lower() if conn else b''
+        self.close_connection = conn == b'close' or (
+            self.request_version == 'HTTP/1.0' and conn != b'keep-alive')
+        
+        self.do_POST()
+        self.wfile.flush()
+        return True
+    
+    @property
+    def content_length(self) -> int:
+        """Request body length, from the fast path or the parsed headers; -1 if malformed"""
+        if self._content_length is None:
+            # Same rule as _CONTENT_LENGTH_RE: only ASCII digits are a length
+            value = self.headers.get('Content-Length', '0').strip(' \t\r\n')
+            self._content_length = int(value) if value.isascii() and value.isdigit() else -1
+        return self._content_length
+    
+    def read_form(self) -> Dict[bytes, bytes]:
+        """Read and parse the urlencoded request body"""
+        length = self.content_length
+        if length > len(self._body_buf):
+            return parse_form(self.rfile.read(length))  # Oversized; don't keep it around
+        # readinto drains what rfile has already buffered before the socket
+        length = self.rfile.readinto(memoryview(self._body_buf)[:length])
+        return parse_form(self._body_buf, length)
+    
+    def discard_body(self):
+        """Skip a request body the handler doesn't use.
+        
+        Left in the stream, it would be parsed as the start of the next
+        keep-alive request. Bodies too big for the buffer, or of unknown
+        length, aren't worth reading; the connection is closed instead.
+        """
+        length = self.content_length
+        if length > len(self._body_buf) or 'Transfer-Encoding' in self.headers:
+            self.close_connection = True
+        elif length:
+            self.rfile.readinto(memoryview(self._body_buf)[:length])
     
     def do_GET(self):
         """Handle GET requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        if path == '/':
-            self.serve_web_ui()
-        elif path == '/health':
-            self.serve_health()
-        elif path == '/api/config':
-            self.serve_config()
-        elif path == '/api/history':
-            self.serve_history()
-        elif path == '/api/stats':
-            self.serve_stats()
+        handler = self._GET_ROUTES.get(self.path.split('?', 1)[0])
+        if handler:
+            getattr(self, handler)()
         else:
             self.send_error(404, "Not Found")
     
     def do_POST(self):
         """Handle POST requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
+        path = self.path.split('?', 1)[0]
+        
+        if self.content_length < 0:
+            # The body's extent is unknown, so the connection can't be reused
+            self.send_error(400, "Invalid Content-Length")
+            return
         
         # Check rate limiting
         client_ip = self.client_address[0]
@@ -148,518 +492,32 @@ class MCPHTTPHandler(BaseHTTPRequestHandler):
             self.send_error(429, "Too Many Requests")
             return
         
-        if path == '/execute':
-            self.handle_execute()
-        elif path == '/api/session':
-            self.handle_session()
+        handler = self._POST_ROUTES.get(path)
+        if handler:
+            getattr(self, handler)()
         else:
             self.send_error(404, "Not Found")
     
     def serve_web_ui(self):
         """Serve the enhanced web interface"""
-        html_content = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MCP Noble Shell Server</title>
-    <style>
-        :root {
-            --bg-primary: #0a0e27;
-            --bg-secondary: #1a1f3a;
-            --text-primary: #e4e4e7;
-            --text-secondary: #a1a1aa;
-            --accent: #3b82f6;
-            --success: #10b981;
-            --error: #ef4444;
-            --warning: #f59e0b;
-        }
-        
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Segoe UI', system-ui, sans-serif;
-            background: var(--bg-primary);
-            color: var(--text-primary);
-            min-height: 100vh;
-            display: flex;
-            flex-direction: column;
-        }
-        
-        header {
-            background: var(--bg-secondary);
-            padding: 1rem 2rem;
-            border-bottom: 1px solid rgba(255,255,255,0.1);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        
-        h1 {
-            font-size: 1.5rem;
-            font-weight: 600;
-            color: var(--accent);
-        }
-        
-        .stats {
-            display: flex;
-            gap: 2rem;
-            font-size: 0.875rem;
-        }
-        
-        .stat {
-            color: var(--text-secondary);
-        }
-        
-        .stat span {
-            color: var(--text-primary);
-            font-weight: 500;
-        }
-        
-        main {
-            flex: 1;
-            display: flex;
-            padding: 2rem;
-            gap: 2rem;
-            max-width: 1400px;
-            width: 100%;
-            margin: 0 auto;
-        }
-        
-        .terminal-section {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .terminal {
-            background: var(--bg-secondary);
-            border-radius: 8px;
-            padding: 1.5rem;
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-        }
-        
-        .output {
-            flex: 1;
-            overflow-y: auto;
-            font-family: 'Consolas', 'Monaco', monospace;
-            font-size: 0.875rem;
-            line-height: 1.6;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-            margin-bottom: 1rem;
-            max-height: 500px;
-        }
-        
-        .command-line {
-            display: flex;
-            gap: 0.5rem;
-            align-items: center;
-        }
-        
-        .prompt {
-            color: var(--success);
-            font-family: monospace;
-        }
-        
-        #commandInput {
-            flex: 1;
-            background: var(--bg-primary);
-            border: 1px solid rgba(255,255,255,0.1);
-            color: var(--text-primary);
-            padding: 0.5rem;
-            border-radius: 4px;
-            font-family: monospace;
-            font-size: 0.875rem;
-        }
-        
-        #commandInput:focus {
-            outline: none;
-            border-color: var(--accent);
-        }
-        
-        button {
-            background: var(--accent);
-            color: white;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 4px;
-            cursor: pointer;
-            font-weight: 500;
-            transition: background 0.2s;
-        }
-        
-        button:hover {
-            background: #2563eb;
-        }
-        
-        button:disabled {
-            background: var(--text-secondary);
-            cursor: not-allowed;
-        }
-        
-        .sidebar {
-            width: 300px;
-        }
-        
-        .panel {
-            background: var(--bg-secondary);
-            border-radius: 8px;
-            padding: 1.5rem;
-            margin-bottom: 1.5rem;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-        }
-        
-        .panel h2 {
-            font-size: 1.125rem;
-            margin-bottom: 1rem;
-            color: var(--accent);
-        }
-        
-        .allowed-commands {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 0.5rem;
-        }
-        
-        .command-tag {
-            background: var(--bg-primary);
-            padding: 0.25rem 0.75rem;
-            border-radius: 4px;
-            font-size: 0.75rem;
-            font-family: monospace;
-            color: var(--text-secondary);
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        
-        .command-tag:hover {
-            color: var(--text-primary);
-            background: rgba(59, 130, 246, 0.2);
-        }
-        
-        .history-item {
-            padding: 0.5rem;
-            margin-bottom: 0.5rem;
-            background: var(--bg-primary);
-            border-radius: 4px;
-            font-size: 0.875rem;
-            cursor: pointer;
-            transition: background 0.2s;
-        }
-        
-        .history-item:hover {
-            background: rgba(59, 130, 246, 0.1);
-        }
-        
-        .history-command {
-            color: var(--text-primary);
-            font-family: monospace;
-        }
-        
-        .history-time {
-            color: var(--text-secondary);
-            font-size: 0.75rem;
-        }
-        
-        .success { color: var(--success); }
-        .error { color: var(--error); }
-        .warning { color: var(--warning); }
-        
-        .loading {
-            display: inline-block;
-            animation: spin 1s linear infinite;
-        }
-        
-        @keyframes spin {
-            from { transform: rotate(0deg); }
-            to { transform: rotate(360deg); }
-        }
-        
-        @media (max-width: 768px) {
-            main {
-                flex-direction: column;
-            }
-            .sidebar {
-                width: 100%;
-            }
-        }
-    </style>
-</head>
-<body>
-    <header>
-        <h1>🚀 MCP Noble Shell Server</h1>
-        <div class="stats">
-            <div class="stat">Session: <span id="sessionId">-</span></div>
-            <div class="stat">Commands: <span id="commandCount">0</span></div>
-            <div class="stat">Uptime: <span id="uptime">0s</span></div>
-        </div>
-    </header>
-    
-    <main>
-        <div class="terminal-section">
-            <div class="terminal">
-                <div class="output" id="output">Welcome to MCP Noble Shell Server!
-Type 'help' for available commands or click on any command tag.
-</div>
-                <div class="command-line">
-                    <span class="prompt">ubuntu@mcp:~$</span>
-                    <input type="text" id="commandInput" placeholder="Enter command..." autofocus>
-                    <button id="executeBtn" onclick="executeCommand()">Execute</button>
-                    <button onclick="clearTerminal()">Clear</button>
-                </div>
-            </div>
-        </div>
-        
-        <div class="sidebar">
-            <div class="panel">
-                <h2>📋 Allowed Commands</h2>
-                <div class="allowed-commands" id="allowedCommands"></div>
-            </div>
-            
-            <div class="panel">
-                <h2>📜 Command History</h2>
-                <div id="history"></div>
-            </div>
-            
-            <div class="panel">
-                <h2>⚡ Quick Actions</h2>
-                <button onclick="runCommand('uname -a')" style="width: 100%; margin-bottom: 0.5rem;">System Info</button>
-                <button onclick="runCommand('df -h')" style="width: 100%; margin-bottom: 0.5rem;">Disk Usage</button>
-                <button onclick="runCommand('free -h')" style="width: 100%; margin-bottom: 0.5rem;">Memory Usage</button>
-                <button onclick="runCommand('ps aux | head -10')" style="width: 100%;">Top Processes</button>
-            </div>
-        </div>
-    </main>
-    
-    <script>
-        let sessionId = null;
-        let commandHistory = [];
-        let historyIndex = -1;
-        let startTime = Date.now();
-        
-        // Initialize session
-        async function initSession() {
-            try {
-                const response = await fetch('/api/session', { method: 'POST' });
-                const data = await response.json();
-                sessionId = data.session_id;
-                document.getElementById('sessionId').textContent = sessionId.substring(0, 8) + '...';
-                localStorage.setItem('mcp_session', sessionId);
-            } catch (error) {
-                console.error('Failed to initialize session:', error);
-            }
-        }
-        
-        // Load configuration
-        async function loadConfig() {
-            try {
-                const response = await fetch('/api/config');
-                const data = await response.json();
-                const commands = data.allowed_commands.split(',');
-                const container = document.getElementById('allowedCommands');
-                container.innerHTML = commands.map(cmd => 
-                    `<div class="command-tag" onclick="runCommand('${cmd}')">${cmd}</div>`
-                ).join('');
-            } catch (error) {
-                console.error('Failed to load config:', error);
-            }
-        }
-        
-        // Execute command
-        async function executeCommand() {
-            const input = document.getElementById('commandInput');
-            const command = input.value.trim();
-            
-            if (!command) return;
-            
-            if (command === 'help') {
-                showHelp();
-                input.value = '';
-                return;
-            }
-            
-            if (command === 'clear') {
-                clearTerminal();
-                input.value = '';
-                return;
-            }
-            
-            const btn = document.getElementById('executeBtn');
-            btn.disabled = true;
-            btn.innerHTML = '<span class="loading">⚡</span> Running...';
-            
-            appendOutput(`$ ${command}`, 'prompt');
-            
-            try {
-                const formData = new URLSearchParams();
-                formData.append('command', command);
-                formData.append('session_id', sessionId);
-                
-                const response = await fetch('/execute', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/x-www-form-urlencoded',
-                    },
-                    body: formData
-                });
-                
-                const result = await response.json();
-                
-                if (result.success) {
-                    if (result.output) {
-                        appendOutput(result.output, 'success');
-                    }
-                    if (result.error) {
-                        appendOutput(result.error, 'warning');
-                    }
-                } else {
-                    appendOutput(`Error: ${result.error}`, 'error');
-                }
-                
-                // Update history
-                commandHistory.push(command);
-                historyIndex = commandHistory.length;
-                updateHistory();
-                updateStats();
-                
-            } catch (error) {
-                appendOutput(`Network error: ${error.message}`, 'error');
-            } finally {
-                btn.disabled = false;
-                btn.innerHTML = 'Execute';
-                input.value = '';
-                input.focus();
-            }
-        }
-        
-        // Helper functions
-        function appendOutput(text, className = '') {
-            const output = document.getElementById('output');
-            const line = document.createElement('div');
-            if (className) line.className = className;
-            line.textContent = text;
-            output.appendChild(line);
-            output.scrollTop = output.scrollHeight;
-        }
-        
-        function clearTerminal() {
-            document.getElementById('output').innerHTML = 'Terminal cleared.\\n';
-        }
-        
-        function runCommand(cmd) {
-            document.getElementById('commandInput').value = cmd;
-            executeCommand();
-        }
-        
-        function showHelp() {
-            appendOutput(`
-Available commands:
-  help     - Show this help message
-  clear    - Clear the terminal
-  [cmd]    - Execute any allowed shell command
-
-Keyboard shortcuts:
-  Enter    - Execute command
-  ↑/↓      - Navigate command history
-  Ctrl+L   - Clear terminal
-
-Click on any command tag to run it directly.
-            `, 'success');
-        }
-        
-        async function updateHistory() {
-            try {
-                const response = await fetch(`/api/history?session_id=${sessionId}`);
-                const data = await response.json();
-                const container = document.getElementById('history');
-                
-                container.innerHTML = data.history.slice(-5).reverse().map(item => `
-                    <div class="history-item" onclick="runCommand('${item.command}')">
-                        <div class="history-command">${item.command}</div>
-                        <div class="history-time">${new Date(item.timestamp).toLocaleTimeString()}</div>
-                    </div>
-                `).join('');
-            } catch (error) {
-                console.error('Failed to update history:', error);
-            }
-        }
-        
-        function updateStats() {
-            const count = parseInt(document.getElementById('commandCount').textContent) + 1;
-            document.getElementById('commandCount').textContent = count;
-        }
-        
-        function updateUptime() {
-            const elapsed = Math.floor((Date.now() - startTime) / 1000);
-            const hours = Math.floor(elapsed / 3600);
-            const minutes = Math.floor((elapsed % 3600) / 60);
-            const seconds = elapsed % 60;
-            
-            let uptime = '';
-            if (hours > 0) uptime += `${hours}h `;
-            if (minutes > 0) uptime += `${minutes}m `;
-            uptime += `${seconds}s`;
-            
-            document.getElementById('uptime').textContent = uptime;
-        }
-        
-        // Event listeners
-        document.getElementById('commandInput').addEventListener('keydown', (e) => {
-            if (e.key === 'Enter') {
-                executeCommand();
-            } else if (e.key === 'ArrowUp') {
-                e.preventDefault();
-                if (historyIndex > 0) {
-                    historyIndex--;
-                    e.target.value = commandHistory[historyIndex];
-                }
-            } else if (e.key === 'ArrowDown') {
-                e.preventDefault();
-                if (historyIndex < commandHistory.length - 1) {
-                    historyIndex++;
-                    e.target.value = commandHistory[historyIndex];
-                } else {
-                    historyIndex = commandHistory.length;
-                    e.target.value = '';
-                }
-            } else if (e.ctrlKey && e.key === 'l') {
-                e.preventDefault();
-                clearTerminal();
-            }
-        });
-        
-        // Initialize
-        window.onload = async () => {
-            await initSession();
-            await loadConfig();
-            setInterval(updateUptime, 1000);
-        };
-    </script>
-</body>
-</html>
-        '''
-        
+        gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = WEB_UI_GZIP if gzipped else WEB_UI_BYTES
         self.send_response(200)
-        self.send_header('Content-Type', 'text/html')
-        self.end_headers()
-        self.wfile.write(html_content.encode())
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'public, max-age=3600')
+        self.end_headers(body)
     
     def serve_health(self):
         """Serve health check endpoint"""
         health_data = {
             'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now_iso(),
             'version': '2.0.0',
-            'uptime': int(time.time() - self.server.start_time),
+            'uptime': int(time.monotonic() - self.server.start_time),
             'active_sessions': len(session_manager.sessions)
         }
         
@@ -667,14 +525,12 @@ Click on any command tag to run it directly.
     
     def serve_config(self):
         """Serve configuration information"""
-        config_data = {
-            'allowed_commands': CONFIG.get('ALLOWED_COMMANDS', ''),
-            'command_timeout': int(CONFIG.get('COMMAND_TIMEOUT', '30')),
-            'max_output_size': int(CONFIG.get('MAX_OUTPUT_SIZE', '1048576')),
-            'rate_limit': int(CONFIG.get('RATE_LIMIT', '60'))
-        }
-        
-        self.send_json_response(config_data)
+        if CONFIG_ETAG in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', CONFIG_ETAG)
+            self.end_headers()
+            return
+        self.send_json_body(CONFIG_JSON_BYTES, {'ETag': CONFIG_ETAG, 'Cache-Control': 'no-cache'})
     
     def serve_history(self):
         """Serve command history for a session"""
@@ -685,34 +541,32 @@ Click on any command tag to run it directly.
             self.send_error(401, "Invalid or expired session")
             return
         
-        history = session_manager.command_history.get(session_id, [])
-        self.send_json_response({'history': history[-10:]})  # Last 10 commands
+        history = session_manager.recent_commands(session_id, 10)
+        self.send_json_response({'history': history})  # Last 10 commands
     
     def serve_stats(self):
         """Serve server statistics"""
         stats_data = {
             'total_sessions': len(session_manager.sessions),
-            'total_commands': sum(s['commands_run'] for s in session_manager.sessions.values()),
-            'server_uptime': int(time.time() - self.server.start_time),
-            'active_sessions': len([s for s in session_manager.sessions.values() 
-                                  if time.time() - s['last_access'] < 300])  # Active in last 5 min
+            'total_commands': session_manager.total_commands,
+            'server_uptime': int(time.monotonic() - self.server.start_time),
+            'active_sessions': session_manager.active_count  # Active in last 5 min, as of the last sweep
         }
         
         self.send_json_response(stats_data)
     
     def handle_session(self):
         """Handle session creation"""
+        self.discard_body()
         session_id = session_manager.create_session()
         self.send_json_response({'session_id': session_id})
     
     def handle_execute(self):
         """Handle command execution with enhanced security"""
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length).decode('utf-8')
-        params = parse_qs(post_data)
+        form = self.read_form()
         
-        command = params.get('command', [''])[0]
-        session_id = params.get('session_id', [''])[0]
+        command = form_value(form, b'command')
+        session_id = form_value(form, b'session_id')
         
         # Validate session
         if not session_manager.validate_session(session_id):
@@ -724,15 +578,21 @@ Click on any command tag to run it directly.
             self.send_json_response({'success': False, 'error': 'No command provided'})
             return
         
-        # Check if command is allowed
-        allowed_commands = CONFIG.get('ALLOWED_COMMANDS', '').split(',')
-        command_base = command.split()[0] if command.split() else ''
+        # Check if command is allowed; argv[0] is exactly what gets exec'd
+        try:
+            argv = shlex.split(command)
+        except ValueError as e:
+            result = {'success': False, 'error': f'Could not parse command: {e}'}
+            session_manager.add_command(session_id, command, result)
+            self.send_json_response(result)
+            return
+        command_base = argv[0] if argv else ''
         
-        if command_base not in allowed_commands:
+        if command_base not in ALLOWED_SET:
             error_msg = f"Command '{command_base}' is not allowed. "
-            error_msg += f"Allowed commands: {', '.join(allowed_commands[:10])}"
-            if len(allowed_commands) > 10:
-                error_msg += f" and {len(allowed_commands) - 10} more"
+            error_msg += f"Allowed commands: {', '.join(ALLOWED_COMMANDS[:10])}"
+            if len(ALLOWED_COMMANDS) > 10:
+                error_msg += f" and {len(ALLOWED_COMMANDS) - 10} more"
             
             result = {'success': False, 'error': error_msg}
             session_manager.add_command(session_id, command, result)
@@ -740,42 +600,31 @@ Click on any command tag to run it directly.
             return
         
         # Additional security checks
-        dangerous_patterns = ['..', '~/', '/etc/', '/root/', '$(', '${', '`', ';rm', ';sudo']
-        for pattern in dangerous_patterns:
-            if pattern in command:
-                result = {'success': False, 'error': f'Security violation: dangerous pattern "{pattern}" detected'}
-                session_manager.add_command(session_id, command, result)
-                self.send_json_response(result)
-                return
+        match = DANGEROUS_RE.search(command)
+        if match:
+            result = {'success': False, 'error': f'Security violation: dangerous pattern "{match.group(0)}" detected'}
+            session_manager.add_command(session_id, command, result)
+            self.send_json_response(result)
+            return
         
         # Execute command with timeout and size limits
         try:
-            timeout = int(CONFIG.get('COMMAND_TIMEOUT', '30'))
-            max_output = int(CONFIG.get('MAX_OUTPUT_SIZE', '1048576'))
-            
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=os.path.expanduser('~'),
-                env={**os.environ, 'PATH': '/usr/local/bin:/usr/bin:/bin'}
-            )
-            
-            stdout, stderr = process.communicate(timeout=timeout)
-            
-            # Truncate output if too large
-            if len(stdout) > max_output:
-                stdout = stdout[:max_output] + f"\\n... (output truncated at {max_output} bytes)"
-            if len(stderr) > max_output:
-                stderr = stderr[:max_output] + f"\\n... (error output truncated at {max_output} bytes)"
+            timeout = COMMAND_TIMEOUT
+            if not COMMAND_SLOTS.acquire(timeout=timeout):
+                result = {'success': False, 'error': 'Server busy, try again shortly'}
+                session_manager.add_command(session_id, command, result)
+                self.send_json_response(result)
+                return
+            try:
+                stdout, stderr, exit_code = run_command(argv, timeout, MAX_OUTPUT_SIZE)
+            finally:
+                COMMAND_SLOTS.release()
             
             result = {
                 'success': True,
                 'output': stdout,
                 'error': stderr,
-                'exit_code': process.returncode
+                'exit_code': exit_code
             }
             
         except subprocess.TimeoutExpired:
@@ -790,24 +639,37 @@ Click on any command tag to run it directly.
     
     def send_json_response(self, data):
         """Send JSON response"""
-        response = json.dumps(data)
+        self.send_json_body(dumps(data))
+    
+    def send_json_body(self, response: bytes, headers: Optional[Dict[str, str]] = None):
+        """Send an already-encoded JSON body, with any extra headers"""
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(response.encode())
+        if headers:
+            for name, value in headers.items():
+                self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers(response)
     
     def log_message(self, format, *args):
         """Custom log format"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = _wall_clock()[2]
         client_ip = self.client_address[0]
         print(f"[{timestamp}] {client_ip} - {format % args}")
 
 # Main server class
-class MCPHTTPServer(HTTPServer):
+class MCPHTTPServer(ThreadingHTTPServer):
+    # One thread per connection, so idle keep-alive sockets never hold up
+    # other clients; only command execution is bounded (COMMAND_SLOTS)
+    daemon_threads = True
+    allow_reuse_address = True
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
 
 def main():
     """Main entry point"""
@@ -822,9 +684,9 @@ def main():
 📍 Server Configuration:
    • Host: {host}
    • Port: {port}
-   • Allowed Commands: {len(CONFIG.get('ALLOWED_COMMANDS', '').split(','))} commands
-   • Command Timeout: {CONFIG.get('COMMAND_TIMEOUT', '30')}s
-   • Rate Limit: {CONFIG.get('RATE_LIMIT', '60')} req/min
+   • Allowed Commands: {len(ALLOWED_COMMANDS)} commands
+   • Command Timeout: {COMMAND_TIMEOUT}s
+   • Rate Limit: {RATE_LIMIT} req/min
 
 🌐 Access URLs:
    • Web Interface: http://{host if host != '0.0.0.0' else 'localhost'}:{port}/
@@ -846,6 +708,7 @@ Press Ctrl+C to stop the server.
         print(f"✅ Server started successfully on {host}:{port}")
         server.serve_forever()
     except KeyboardInterrupt:
+        server.server_close()
         print("\n🛑 Server stopped by user")
     except PermissionError:
         print(f"❌ Error: Permission denied to bind to port {port}")